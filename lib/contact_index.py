@@ -0,0 +1,42 @@
+"""
+Shared inverted index over a list of contacts.
+"""
+
+from collections import defaultdict
+from typing import List
+
+from vcard_parser import Contact
+
+
+class ContactIndex:
+    """
+    Inverted indices over a contact list, built in one linear pass so
+    downstream consumers (duplicate detection, missing-contact checks)
+    do O(1) lookups instead of rescanning the list per query.
+
+    Each index maps a normalized key to the list of contact positions
+    that carry it.
+    """
+
+    def __init__(self, contacts: List[Contact]):
+        self.contacts = contacts
+
+        # Parallel arrays (struct-of-arrays): hot loops iterate these flat
+        # lists by position instead of chasing Contact attribute dicts
+        self.names = [c.get_normalized_name() for c in contacts]
+        self.phone_sets = [c.get_normalized_phones() for c in contacts]
+        self.email_sets = [c.get_normalized_emails() for c in contacts]
+
+        self.by_phone = defaultdict(list)
+        self.by_email = defaultdict(list)
+        self.by_name = defaultdict(list)
+
+        for i in range(len(contacts)):
+            for phone in self.phone_sets[i]:
+                self.by_phone[phone].append(i)
+            for email in self.email_sets[i]:
+                self.by_email[email].append(i)
+            self.by_name[self.names[i]].append(i)
+
+    def __len__(self):
+        return len(self.contacts)
@@ -2,103 +2,355 @@
 Duplicate detection logic for contacts.
 """
 
+import random
+from collections import defaultdict
+from functools import lru_cache
+from itertools import combinations
 from typing import List, Tuple, Set
-from difflib import SequenceMatcher
-from vcard_parser import Contact
+from zlib import crc32
+import numpy as np
+from rapidfuzz import fuzz, process
+from contact_index import ContactIndex
+from vcard_parser import Contact, normalize_phone
 
+# Past this many contacts, phonetic blocking gives way to MinHash/LSH
+# candidate generation, which stays near-linear as the list grows
+_LSH_MIN_CONTACTS = 10000
 
-def similarity_ratio(str1: str, str2: str) -> float:
-    """Calculate similarity ratio between two strings (0.0 to 1.0)."""
-    return SequenceMatcher(None, str1.lower(), str2.lower()).ratio()
+# 16 bands of 4 rows over a 64-permutation signature: pairs with name
+# token Jaccard similarity around 0.7+ almost surely share a band bucket
+_LSH_BANDS = 16
+_LSH_ROWS = 4
 
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_MINHASH_PERMS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(_MERSENNE_PRIME))
+                  for _ in range(_LSH_BANDS * _LSH_ROWS)]
 
-def find_duplicates(contacts: List[Contact], name_threshold: float = 0.85, 
+
+def similarity_ratio(str1: str, str2: str, min_ratio: float = 0.0) -> float:
+    """
+    Calculate similarity ratio between two strings (0.0 to 1.0).
+
+    Token-set scoring compares names as sets of words, so word order and
+    extra middle names don't drag the score down ("John A Smith" matches
+    "John Adam Smith"). If min_ratio is given, pairs that cannot reach it
+    return 0.0 early (rapidfuzz short-circuits below the cutoff).
+    """
+    return fuzz.token_set_ratio(str1.lower(), str2.lower(),
+                                score_cutoff=min_ratio * 100) / 100.0
+
+
+# Soundex letter codes (American Soundex). Vowels and h/w/y map to nothing.
+_SOUNDEX_CODES = {
+    'b': '1', 'f': '1', 'p': '1', 'v': '1',
+    'c': '2', 'g': '2', 'j': '2', 'k': '2', 'q': '2',
+    's': '2', 'x': '2', 'z': '2',
+    'd': '3', 't': '3',
+    'l': '4',
+    'm': '5', 'n': '5',
+    'r': '6',
+}
+
+
+def _soundex(word: str) -> str:
+    """Return the 4-character Soundex code for a word ('' if no letters)."""
+    letters = [c for c in word.lower() if c.isalpha()]
+    if not letters:
+        return ""
+
+    code = [letters[0]]
+    prev = _SOUNDEX_CODES.get(letters[0], '')
+
+    for c in letters[1:]:
+        digit = _SOUNDEX_CODES.get(c, '')
+        if digit and digit != prev:
+            code.append(digit)
+        # h and w are transparent: they don't reset the previous code
+        if c not in 'hw':
+            prev = digit
+
+    return (''.join(code) + '000')[:4]
+
+
+@lru_cache(maxsize=None)
+def _blocking_key(normalized_name: str) -> str:
+    """
+    Return a coarse phonetic key used to bucket contacts before the
+    expensive name-similarity comparison. Contacts whose names sound
+    alike share a key; contacts in different buckets are never compared.
+
+    Memoized on the name string: the Google-only and cross-source passes
+    both key the same contacts, so the second pass reuses every result.
+    """
+    if not normalized_name:
+        return ""
+    # Use the surname (last token) so "John Smith" and "Jon Smith" collide
+    return _soundex(normalized_name.split()[-1])
+
+
+def _name_tokens(name: str) -> Set[str]:
+    """Word tokens plus character trigrams of a normalized name."""
+    tokens = set(name.split())
+    tokens.update(name[k:k + 3] for k in range(len(name) - 2))
+    return tokens
+
+
+@lru_cache(maxsize=None)
+def _minhash_signature(name: str) -> Tuple[int, ...]:
+    """64-permutation MinHash signature of a name's token set (memoized)."""
+    hashes = [crc32(t.encode('utf-8')) for t in _name_tokens(name)]
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+                 for a, b in _MINHASH_PERMS)
+
+
+def _candidate_buckets(names: List[str]) -> List[List[int]]:
+    """
+    Group contact indices into buckets of plausibly-similar names.
+
+    Small lists use phonetic (Soundex) blocking on the surname. Large
+    lists switch to MinHash + banded LSH over name tokens, whose cost
+    grows linearly with the contact count; a pair may then show up in
+    more than one bucket, which the caller deduplicates.
+    """
+    if len(names) < _LSH_MIN_CONTACTS:
+        buckets = defaultdict(list)
+        for i, name in enumerate(names):
+            key = _blocking_key(name)
+            if key:
+                buckets[key].append(i)
+        return [b for b in buckets.values() if len(b) > 1]
+
+    buckets = defaultdict(list)
+    for i, name in enumerate(names):
+        if not name:
+            continue
+        signature = _minhash_signature(name)
+        for band in range(_LSH_BANDS):
+            key = (band, signature[band * _LSH_ROWS:(band + 1) * _LSH_ROWS])
+            buckets[key].append(i)
+    return [b for b in buckets.values() if len(b) > 1]
+
+
+def find_duplicates(contacts: List[Contact], name_threshold: float = 0.85,
                    phone_match: bool = True) -> List[Tuple[Contact, Contact, str]]:
     """
     Find potential duplicate contacts.
-    
+
+    Exact phone/email matches are found with a single linear pass over
+    inverted indices. Fuzzy name matching is only run inside buckets of
+    phonetically-similar names (blocking), which keeps the expensive
+    pairwise comparison away from the full O(n^2) contact cross-product.
+
     Args:
         contacts: List of Contact objects to check
         name_threshold: Similarity threshold for name matching (0.0-1.0)
         phone_match: If True, also match on phone numbers
-        
+
     Returns:
         List of tuples: (contact1, contact2, reason)
     """
+    # (i, j) with i < j -> list of reasons the pair looks like a duplicate
+    pair_reasons = defaultdict(list)
+
+    # One shared index covers the whole list, so exact matches are found
+    # even when the two contacts land in different name buckets.
+    index = ContactIndex(contacts)
+
+    if phone_match:
+        for phone, idxs in index.by_phone.items():
+            if len(idxs) > 1:
+                for i, j in combinations(idxs, 2):
+                    pair_reasons[(i, j)].append(f"Same phone: {phone}")
+
+    # Bucket contacts by candidate key, then only compare names within
+    # buckets. The index's flat name array feeds the scoring kernel
+    # directly; Contact objects are only touched when emitting results.
+    names = index.names
+
+    cutoff = int(name_threshold * 100)
+    name_scores = {}
+
+    # Identical normalized names always match; pairing them straight off
+    # the name index guarantees mass-duplicated contacts are found no
+    # matter how the prefilters below carve up the buckets.
+    for name, idxs in index.by_name.items():
+        if name and len(idxs) > 1:
+            for pair in combinations(idxs, 2):
+                name_scores[pair] = 1.0
+
+    def record_pairs(group_a, group_b, similarity):
+        # Expand a scored pair of distinct names to every contact pair
+        # across the two groups carrying those names
+        for i in group_a:
+            for j in group_b:
+                name_scores.setdefault((i, j) if i < j else (j, i), similarity)
+
+    for bucket in _candidate_buckets(names):
+        # Collapse repeated names: each distinct name is scored once and
+        # the result fans out to every contact in the matched groups.
+        # Exact-equal pairs were already recorded above.
+        groups = {}
+        for i in bucket:
+            groups.setdefault(names[i], []).append(i)
+        if len(groups) < 2:
+            continue
+        distinct = list(groups)
+
+        if len(distinct) == 2:
+            # Most buckets are pairs; one direct scorer call beats
+            # building a 2x2 matrix through numpy
+            a, b = distinct
+            similarity = similarity_ratio(a, b, min_ratio=name_threshold)
+            if similarity > 0 and similarity >= name_threshold:
+                record_pairs(groups[a], groups[b], similarity)
+            continue
+
+        # Score the whole bucket in one C call; entries below the cutoff
+        # come back as 0 and workers=-1 spreads rows across CPU cores.
+        # Even common-surname buckets stay tractable: the matrix covers
+        # distinct names only, and a cheaper prefilter is not sound for
+        # token-set scoring (a subset name like plain "smith" matches
+        # every "x smith" at 100% while sharing no rare trigrams).
+        scores = process.cdist(distinct, distinct,
+                               scorer=fuzz.token_set_ratio,
+                               score_cutoff=cutoff, workers=-1, dtype=np.uint8)
+        for a, b in zip(*np.where(np.triu(scores, k=1) >= max(cutoff, 1))):
+            record_pairs(groups[distinct[a]], groups[distinct[b]],
+                         scores[a, b] / 100.0)
+
+    for (i, j), similarity in name_scores.items():
+        pair_reasons[(i, j)].append(f"Similar names: {similarity:.0%} match")
+
+    for email, idxs in index.by_email.items():
+        if len(idxs) > 1:
+            for i, j in combinations(idxs, 2):
+                pair_reasons[(i, j)].append(f"Same email: {email}")
+
     duplicates = []
-    
-    # Track already compared pairs to avoid duplicates
-    compared = set()
-    
-    for i, contact1 in enumerate(contacts):
-        for j, contact2 in enumerate(contacts[i+1:], start=i+1):
-            if (i, j) in compared:
-                continue
-            
-            compared.add((i, j))
-            reasons = []
-            
-            # Check phone number matches
-            phones1 = set(contact1.get_normalized_phones())
-            phones2 = set(contact2.get_normalized_phones())
-            
-            if phones1 and phones2 and phones1.intersection(phones2):
-                reasons.append(f"Same phone: {phones1.intersection(phones2)}")
-            
-            # Check name similarity
-            name1 = contact1.get_normalized_name()
-            name2 = contact2.get_normalized_name()
-            
-            if name1 and name2:
-                similarity = similarity_ratio(name1, name2)
-                if similarity >= name_threshold:
-                    reasons.append(f"Similar names: {similarity:.0%} match")
-            
-            # Check exact email matches
-            emails1 = set([e.lower() for e in contact1.emails])
-            emails2 = set([e.lower() for e in contact2.emails])
-            
-            if emails1 and emails2 and emails1.intersection(emails2):
-                reasons.append(f"Same email: {emails1.intersection(emails2)}")
-            
-            # If we found any reason, mark as duplicate
-            if reasons:
-                duplicates.append((contact1, contact2, " | ".join(reasons)))
-    
+    for i, j in sorted(pair_reasons):
+        duplicates.append((contacts[i], contacts[j], " | ".join(pair_reasons[(i, j)])))
+
+    return duplicates
+
+
+def find_cross_duplicates(google_contacts: List[Contact],
+                          ios_contacts: List[Contact],
+                          name_threshold: float = 0.85,
+                          phone_match: bool = True) -> List[Tuple[Contact, Contact, str]]:
+    """
+    Find duplicate pairs between two sources, skipping same-source pairs.
+
+    Doing the cross-product directly costs N_g x N_i comparisons at most,
+    against (N_g + N_i)^2 / 2 for running find_duplicates on the
+    concatenated list and discarding the same-source pairs afterwards.
+    Exact matches intersect the two sources' inverted indices; fuzzy name
+    matching blocks over both name arrays together but only scores pairs
+    that straddle the source boundary.
+
+    Args:
+        google_contacts: Contacts from the first source
+        ios_contacts: Contacts from the second source
+        name_threshold: Similarity threshold for name matching (0.0-1.0)
+        phone_match: If True, also match on phone numbers
+
+    Returns:
+        List of tuples: (google_contact, ios_contact, reason)
+    """
+    pair_reasons = defaultdict(list)
+
+    g_index = ContactIndex(google_contacts)
+    i_index = ContactIndex(ios_contacts)
+
+    if phone_match:
+        for phone in g_index.by_phone.keys() & i_index.by_phone.keys():
+            for gi in g_index.by_phone[phone]:
+                for ii in i_index.by_phone[phone]:
+                    pair_reasons[(gi, ii)].append(f"Same phone: {phone}")
+
+    # Bucket both sources' names together so cross-source candidates
+    # share buckets; indices >= n_google belong to the iOS side.
+    n_google = len(g_index.names)
+    names = g_index.names + i_index.names
+
+    cutoff = int(name_threshold * 100)
+    name_scores = {}
+
+    # Identical normalized names across the sources always match,
+    # mirroring find_duplicates' exact-name guarantee. Intersecting the
+    # name indices also covers names blocking can't bucket, like ones
+    # whose surname has no letters and so gets an empty phonetic key.
+    for name in g_index.by_name.keys() & i_index.by_name.keys():
+        if name:
+            for gi in g_index.by_name[name]:
+                for ii in i_index.by_name[name]:
+                    name_scores[(gi, ii)] = 1.0
+
+    for bucket in _candidate_buckets(names):
+        g_side = [i for i in bucket if i < n_google]
+        i_side = [i - n_google for i in bucket if i >= n_google]
+        if not g_side or not i_side:
+            continue
+
+        if len(g_side) == 1 and len(i_side) == 1:
+            gi, ii = g_side[0], i_side[0]
+            similarity = similarity_ratio(g_index.names[gi], i_index.names[ii],
+                                          min_ratio=name_threshold)
+            if similarity > 0 and similarity >= name_threshold:
+                name_scores.setdefault((gi, ii), similarity)
+            continue
+
+        # Rectangular score matrix: only cross-source cells are computed
+        scores = process.cdist([g_index.names[i] for i in g_side],
+                               [i_index.names[j] for j in i_side],
+                               scorer=fuzz.token_set_ratio,
+                               score_cutoff=cutoff, workers=-1, dtype=np.uint8)
+        for a, b in zip(*np.where(scores >= max(cutoff, 1))):
+            name_scores.setdefault((g_side[a], i_side[b]), scores[a, b] / 100.0)
+
+    for (gi, ii), similarity in name_scores.items():
+        pair_reasons[(gi, ii)].append(f"Similar names: {similarity:.0%} match")
+
+    for email in g_index.by_email.keys() & i_index.by_email.keys():
+        for gi in g_index.by_email[email]:
+            for ii in i_index.by_email[email]:
+                pair_reasons[(gi, ii)].append(f"Same email: {email}")
+
+    duplicates = []
+    for gi, ii in sorted(pair_reasons):
+        duplicates.append((google_contacts[gi], ios_contacts[ii],
+                           " | ".join(pair_reasons[(gi, ii)])))
+
     return duplicates
 
 
-def find_missing_contacts(source_contacts: List[Contact], 
+def find_missing_contacts(source_contacts: List[Contact],
                          target_contacts: List[Contact]) -> List[Contact]:
     """
     Find contacts in source that are not in target.
     
     Args:
         source_contacts: Contacts from source (e.g., Google)
-        target_contacts: Contacts from target (e.g., iPhone)
-        
+        target_contacts: Contacts from target (e.g., iPhone), either a
+            list or an already-built ContactIndex
+
     Returns:
         List of contacts from source that don't exist in target
     """
-    # Build sets of normalized identifiers from target
-    target_phones = set()
-    target_names = set()
-    target_emails = set()
-    
-    for contact in target_contacts:
-        target_phones.update(contact.get_normalized_phones())
-        target_names.add(contact.get_normalized_name())
-        target_emails.update([e.lower() for e in contact.emails])
-    
+    if not isinstance(target_contacts, ContactIndex):
+        target_contacts = ContactIndex(target_contacts)
+
     missing = []
-    
+
     for contact in source_contacts:
-        # Check if this contact exists in target by any identifier
-        has_phone_match = any(phone in target_phones 
-                             for phone in contact.get_normalized_phones())
-        has_name_match = contact.get_normalized_name() in target_names
-        has_email_match = any(email.lower() in target_emails 
-                             for email in contact.emails)
+        # Check if this contact exists in target by any identifier.
+        # isdisjoint short-circuits on the first shared key in C, with no
+        # intermediate set allocated.
+        has_phone_match = not target_contacts.by_phone.keys().isdisjoint(
+            contact.get_normalized_phones())
+        has_name_match = contact.get_normalized_name() in target_contacts.by_name
+        has_email_match = not target_contacts.by_email.keys().isdisjoint(
+            contact.get_normalized_emails())
         
         # If no match found, it's missing
         if not (has_phone_match or has_name_match or has_email_match):
@@ -130,7 +382,7 @@ def merge_duplicate_contacts(contact1: Contact, contact2: Contact) -> Contact:
     seen_normalized = set()
     unique_phones = []
     for phone in all_phones:
-        normalized = contact1.normalize_phone(phone)
+        normalized = normalize_phone(phone)
         if normalized not in seen_normalized:
             seen_normalized.add(normalized)
             unique_phones.append(phone)
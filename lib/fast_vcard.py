@@ -0,0 +1,125 @@
+"""
+Minimal vCard tokenizer for the handful of properties this tool uses.
+
+vobject is a full RFC-compliant parser and builds heavyweight objects for
+every property; Contact only ever reads FN, N, TEL, EMAIL, ORG, NOTE,
+PHOTO and ADR. This module unfolds continuation lines and dispatches on
+the property name directly, which is several times faster and keeps the
+raw card text around for lossless re-export. Cards using encodings the
+tokenizer doesn't handle (e.g. quoted-printable) are declined so the
+caller can fall back to vobject.
+"""
+
+from typing import Dict, Iterator, List, Optional
+
+# Properties the fast parser extracts; everything else is skipped
+_PARSED_PROPS = frozenset({'FN', 'N', 'TEL', 'EMAIL', 'ORG', 'NOTE', 'PHOTO', 'ADR'})
+
+
+def iter_vcard_blocks(lines) -> Iterator[str]:
+    """
+    Yield each raw vCard block (BEGIN:VCARD through END:VCARD inclusive)
+    from an iterable of lines, e.g. an open file.
+    """
+    block = []
+    in_card = False
+
+    for line in lines:
+        marker = line.strip().upper()
+        if marker == 'BEGIN:VCARD':
+            in_card = True
+            block = [line]
+        elif in_card:
+            block.append(line)
+            if marker == 'END:VCARD':
+                yield ''.join(block)
+                in_card = False
+
+
+def _unfold(raw_lines: List[str]) -> List[str]:
+    """Join RFC 6350 folded lines (continuations start with space/tab)."""
+    unfolded = []
+    for line in raw_lines:
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and unfolded:
+            unfolded[-1] += line[1:]
+        else:
+            unfolded.append(line)
+    return unfolded
+
+
+def _unescape(value: str) -> str:
+    """Undo vCard text escaping (\\n, \\, \\; and literal backslash)."""
+    if '\\' not in value:
+        return value
+    return (value.replace('\\n', '\n').replace('\\N', '\n')
+                 .replace('\\,', ',').replace('\\;', ';').replace('\\\\', '\\'))
+
+
+def parse_block(block_text: str, load_photos: bool = True) -> Optional[Dict]:
+    """
+    Parse one vCard block into a dict of Contact fields.
+
+    With load_photos=False the PHOTO property (usually a large base64
+    blob) is not materialized at all; the raw card text still carries it
+    for lossless export. Returns None when the card uses an encoding the
+    tokenizer doesn't support, signalling the caller to fall back to
+    vobject.
+    """
+    fields = {
+        'full_name': "",
+        'first_name': "",
+        'last_name': "",
+        'phones': [],
+        'emails': [],
+        'organization': "",
+        'note': "",
+        'photo': None,
+        'addresses': [],
+    }
+
+    for line in _unfold(block_text.splitlines()):
+        name_part, sep, value = line.partition(':')
+        if not sep:
+            continue
+
+        # Split off parameters, then any group prefix (e.g. "item1.EMAIL")
+        pieces = name_part.split(';')
+        prop = pieces[0]
+        if '.' in prop:
+            prop = prop.split('.', 1)[1]
+        prop = prop.upper()
+
+        if prop not in _PARSED_PROPS:
+            continue
+        if prop == 'PHOTO' and not load_photos:
+            continue
+
+        # Quoted-printable needs a real decoder; let vobject handle it
+        if any('QUOTED-PRINTABLE' in p.upper() for p in pieces[1:]):
+            return None
+
+        if prop == 'FN':
+            fields['full_name'] = _unescape(value)
+        elif prop == 'N':
+            parts = value.split(';')
+            fields['last_name'] = _unescape(parts[0])
+            if len(parts) > 1:
+                fields['first_name'] = _unescape(parts[1])
+        elif prop == 'TEL':
+            fields['phones'].append(value)
+        elif prop == 'EMAIL':
+            fields['emails'].append(value)
+        elif prop == 'ORG':
+            fields['organization'] = _unescape(value.split(';')[0])
+        elif prop == 'NOTE':
+            fields['note'] = _unescape(value)
+        elif prop == 'PHOTO':
+            # Keep the whole raw line (params included, base64 undecoded)
+            # so exporters can splice it back verbatim
+            fields['photo'] = line
+        elif prop == 'ADR':
+            # Raw semicolon-separated components, in vCard field order
+            fields['addresses'].append(value)
+
+    return fields
@@ -13,13 +13,14 @@ Usage:
 import argparse
 import os
 import sys
+from collections import defaultdict
 from datetime import datetime
 import vobject
 
 # Add lib directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lib'))
 
-from vcard_parser import parse_vcard_file, Contact
+from vcard_parser import parse_vcard_file, Contact, normalize_phone
 from detect_duplicates import find_duplicates
 
 
@@ -85,12 +86,20 @@ def create_merged_vcard(contact: Contact) -> vobject.vCard:
     # Addresses
     for addr in contact.addresses:
         try:
-            vcard.add('adr').value = addr.value
+            if isinstance(addr, str):
+                # Fast-parsed addresses are raw semicolon-separated values
+                box, extended, street, city, region, code, country = \
+                    (addr.split(';') + [''] * 7)[:7]
+                vcard.add('adr').value = vobject.vcard.Address(
+                    street=street, city=city, region=region, code=code,
+                    country=country, box=box, extended=extended)
+            else:
+                vcard.add('adr').value = addr.value
         except:
             pass  # Skip if address can't be added
     
-    # Photo
-    if contact.photo:
+    # Photo (raw fast-parsed photo lines are spliced in at write time)
+    if contact.photo and not isinstance(contact.photo, str):
         try:
             vcard.add('photo')
             vcard.photo = contact.photo
@@ -121,7 +130,7 @@ def merge_two_contacts(contact1: Contact, contact2: Contact) -> Contact:
     seen_normalized = set()
     unique_phones = []
     for phone in all_phones:
-        normalized = contact1.normalize_phone(phone)
+        normalized = normalize_phone(phone)
         if normalized and normalized not in seen_normalized:
             seen_normalized.add(normalized)
             unique_phones.append(phone)
@@ -179,74 +188,77 @@ def auto_merge_duplicates(contacts: list, name_threshold: float = 0.90) -> tuple
     """
     # Find all duplicates
     duplicates = find_duplicates(contacts, name_threshold=name_threshold)
-    
-    # Build a map of which contacts should be merged together
-    # Use union-find structure to group all related contacts
-    contact_to_group = {}
-    groups = []
-    
-    def find_group(contact):
-        """Find which group a contact belongs to."""
-        for i, group in enumerate(groups):
-            if contact in group:
-                return i
-        return None
-    
-    def merge_groups(group1_idx, group2_idx):
-        """Merge two groups together."""
-        if group1_idx == group2_idx:
+
+    # Group related contacts with a union-find (disjoint set) over contact
+    # indices: path compression + union by rank keep each operation near
+    # constant time, so grouping stays linear in the number of pairs.
+    parent = list(range(len(contacts)))
+    rank = [0] * len(contacts)
+
+    def find(x):
+        """Find the root of x's group, compressing the path as we go."""
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(a, b):
+        """Join the groups containing a and b."""
+        root_a, root_b = find(a), find(b)
+        if root_a == root_b:
             return
-        groups[group1_idx].update(groups[group2_idx])
-        groups[group2_idx] = set()  # Empty the merged group
-    
-    # Build groups of contacts that should be merged
+        if rank[root_a] < rank[root_b]:
+            root_a, root_b = root_b, root_a
+        parent[root_b] = root_a
+        if rank[root_a] == rank[root_b]:
+            rank[root_a] += 1
+
+    contact_index = {id(c): i for i, c in enumerate(contacts)}
     for contact1, contact2, reason in duplicates:
-        group1 = find_group(contact1)
-        group2 = find_group(contact2)
-        
-        if group1 is None and group2 is None:
-            # Create new group
-            groups.append({contact1, contact2})
-        elif group1 is None:
-            # Add contact1 to group2
-            groups[group2].add(contact1)
-        elif group2 is None:
-            # Add contact2 to group1
-            groups[group1].add(contact2)
-        else:
-            # Merge the two groups
-            merge_groups(group1, group2)
-    
-    # Remove empty groups
-    groups = [g for g in groups if g]
-    
-    # Track which contacts have been merged
-    merged_contacts_set = set()
+        union(contact_index[id(contact1)], contact_index[id(contact2)])
+
+    # Collect the index groups that actually contain duplicates
+    groups_by_root = defaultdict(list)
+    for i in range(len(contacts)):
+        groups_by_root[find(i)].append(i)
+    groups = [g for g in groups_by_root.values() if len(g) > 1]
+
+    # Flag merged contacts by index: one byte per contact, O(1) to test,
+    # no object hashing
+    is_merged = bytearray(len(contacts))
     for group in groups:
-        merged_contacts_set.update(group)
-    
-    # Merge each group
-    merged_results = []
+        for i in group:
+            is_merged[i] = 1
+
+    # The final size is known up front: one entry per group plus every
+    # unmerged contact. Preallocate and fill by position so the result
+    # list never reallocates.
+    final_count = len(groups) + len(contacts) - sum(is_merged)
+    merged_results = [None] * final_count
     merge_log = []
-    
+    out = 0
+
+    # Merge each group
     for group in groups:
-        group_list = list(group)
         # Start with first contact and merge in all others
-        result = group_list[0]
+        result = contacts[group[0]]
         contact_names = [result.full_name]
-        
-        for contact in group_list[1:]:
+
+        for i in group[1:]:
+            contact = contacts[i]
             result = merge_two_contacts(result, contact)
             contact_names.append(contact.full_name)
-        
-        merged_results.append(result)
+
+        merged_results[out] = result
+        out += 1
         merge_log.append(f"Merged {len(group)} contacts: {' + '.join(contact_names)} -> {result.full_name}")
-    
+
     # Add contacts that weren't duplicates
-    for contact in contacts:
-        if contact not in merged_contacts_set:
-            merged_results.append(contact)
-    
+    for i, contact in enumerate(contacts):
+        if not is_merged[i]:
+            merged_results[out] = contact
+            out += 1
+
     return merged_results, merge_log
 
 
@@ -336,11 +348,23 @@ Examples:
     print(f"\nGenerating master contacts file...")
     master_path = os.path.join(args.output_dir, "master_contacts.vcf")
     
-    with open(master_path, 'w', encoding='utf-8') as f:
+    def serialized_cards():
         for contact in merged_contacts:
             # Create a new vCard for this contact
-            vcard = create_merged_vcard(contact)
-            f.write(vcard.serialize())
+            text = create_merged_vcard(contact).serialize()
+            if isinstance(contact.photo, str):
+                # Splice the never-decoded raw PHOTO line back in, at the
+                # card's final terminator — a NOTE may legally contain
+                # the text END:VCARD, so the first occurrence can't be
+                # trusted
+                cut = text.rindex('END:VCARD')
+                text = text[:cut] + contact.photo + '\r\n' + text[cut:]
+            yield text
+
+    # One writelines call over a 1 MB buffer: serialization streams into
+    # large writes instead of one syscall-sized write per contact
+    with open(master_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.writelines(serialized_cards())
     
     print(f"✓ Master contacts saved to: {master_path}")
     
@@ -10,16 +10,25 @@ Usage:
 """
 
 import argparse
+import json
 import os
 import sys
-import re
+from collections import namedtuple
 from datetime import datetime
-import yaml
+
+try:
+    import ahocorasick  # optional C extension (pyahocorasick)
+except ImportError:
+    ahocorasick = None
 
 # Add lib directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lib'))
 
-from vcard_parser import parse_vcard_file, export_contacts_to_vcard
+from vcard_parser import (
+    parse_vcard_file,
+    export_contacts_to_vcard,
+    strip_phone_formatting,
+)
 
 
 def load_filter_config(config_path):
@@ -28,97 +37,257 @@ def load_filter_config(config_path):
         print(f"Warning: Filter config not found at {config_path}")
         print("Using empty filter (no contacts will be excluded)")
         return {}
-    
+
+    # A JSON sidecar caches the parsed config keyed on the YAML mtime:
+    # json.load is an order of magnitude faster than a YAML parse, so
+    # warm runs skip the YAML work entirely
+    cache_path = config_path + '.cache.json'
+    yaml_mtime = os.stat(config_path).st_mtime
+    try:
+        if os.stat(cache_path).st_mtime >= yaml_mtime:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    except (OSError, ValueError):
+        pass  # no cache yet, or unreadable: reparse the YAML below
+
+    # PyYAML only loads when a config actually needs parsing: the
+    # missing-config and warm-cache paths above never pay the import.
+    # The LibYAML C loader parses around 10x faster when available.
+    import yaml
+    try:
+        from yaml import CSafeLoader as Loader
+    except ImportError:
+        from yaml import SafeLoader as Loader
+
     with open(config_path, 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f) or {}
-    
+        config = yaml.load(f, Loader=Loader) or {}
+
     # Ensure all fields are lists (handle None from commented YAML)
-    for key in ['exclude_email_domains', 'exclude_emails', 'exclude_organizations', 
+    for key in ['exclude_email_domains', 'exclude_emails', 'exclude_organizations',
                 'exclude_phone_prefixes', 'exclude_name_patterns', 'keep_if_note_contains']:
         if config.get(key) is None:
             config[key] = []
-    
+
+    # The cache is best-effort: a read-only config dir is fine, and so is
+    # a config with scalars JSON can't carry (YAML parses bare dates to
+    # date objects). Serializing before opening the file means a failed
+    # dump can't leave a truncated sidecar behind.
+    try:
+        payload = json.dumps(config)
+    except (TypeError, ValueError):
+        pass
+    else:
+        try:
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+        except OSError:
+            pass
+
     return config
 
 
-def should_exclude_contact(contact, config):
+def build_substring_automaton(config):
     """
-    Check if a contact should be excluded based on filter rules.
-    
+    Build one Aho-Corasick automaton over every substring rule
+    (organization patterns, name patterns). Email domains are matched
+    exactly against the part after '@', so they don't go through it.
+
+    A single scan of a field then tests all needles at once instead of
+    one Python substring search per rule. Returns None when the optional
+    pyahocorasick package is missing or no substring rules are set, in
+    which case callers use the plain loops.
+    """
+    if ahocorasick is None:
+        return None
+
+    words = {}
+    for category, key in (('organization', 'exclude_organizations'),
+                          ('name', 'exclude_name_patterns')):
+        for needle in config.get(key, []):
+            if needle:
+                words.setdefault(needle.lower(), []).append((category, needle))
+    if not words:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for word, rules in words.items():
+        automaton.add_word(word, rules)
+    automaton.make_automaton()
+    return automaton
+
+
+def _first_match(automaton, text, category):
+    """Return the first rule of the given category found in text."""
+    for _end, rules in automaton.iter(text):
+        for rule_category, needle in rules:
+            if rule_category == category:
+                return needle
+    return None
+
+
+# Rules precompiled once per run; every pair keeps the original-case rule
+# string for the exclusion reason next to its prepared (lowered or
+# normalized) form used for matching
+PreparedFilters = namedtuple('PreparedFilters', [
+    'domains',         # dict lowered domain -> original
+    'emails',          # dict lowered -> original
+    'orgs',            # tuple of (lowered, original)
+    'phone_trie',      # nested dict keyed by digit, '$' holds the rule
+    'name_patterns',   # tuple of (lowered, original)
+    'keep_phrases',    # tuple of lowered phrases
+    'automaton',       # substring automaton or None
+])
+
+def _build_phone_trie(prefixes):
+    """
+    Build a character trie over normalized phone prefixes. Matching a
+    phone then walks it digit by digit — O(len(phone)) however many
+    prefixes are configured — and rejects at the first unshared digit.
+    The '$' sentinel at a node stores the original rule string.
+    """
+    trie = {}
+    for rule in prefixes:
+        if not rule:
+            continue
+        node = trie
+        for char in strip_phone_formatting(rule):
+            node = node.setdefault(char, {})
+        node['$'] = rule
+    return trie
+
+
+def _match_phone_trie(trie, phone):
+    """Return the original rule for the first matching prefix, or None."""
+    node = trie
+    for char in phone:
+        rule = node.get('$')
+        if rule is not None:
+            return rule
+        node = node.get(char)
+        if node is None:
+            return None
+    return node.get('$')
+
+
+def prepare_filters(config):
+    """Precompile config rules into the form the per-contact checks use."""
+    def lowered_pairs(key):
+        return tuple((rule.lower(), rule) for rule in config.get(key, []) if rule)
+
+    # Domain rules are keyed by the bare domain: configs written for the
+    # old substring scan ("@oldjob.com", ".oldjob.com") keep working
+    return PreparedFilters(
+        domains={rule.lower().lstrip('@.'): rule
+                 for rule in config.get('exclude_email_domains', [])
+                 if rule and rule.lstrip('@.')},
+        emails=dict(lowered_pairs('exclude_emails')),
+        orgs=lowered_pairs('exclude_organizations'),
+        phone_trie=_build_phone_trie(config.get('exclude_phone_prefixes', [])),
+        name_patterns=lowered_pairs('exclude_name_patterns'),
+        keep_phrases=tuple(rule.lower()
+                           for rule in config.get('keep_if_note_contains', []) if rule),
+        automaton=build_substring_automaton(config),
+    )
+
+
+def should_exclude_contact(contact, filters):
+    """
+    Check if a contact should be excluded based on prepared filter rules.
+
+    Args:
+        contact: Contact to check
+        filters: PreparedFilters from prepare_filters()
+
     Returns:
         (should_exclude, reason)
     """
     # Check for exception tags in notes first
-    keep_phrases = config.get('keep_if_note_contains', [])
-    if keep_phrases and contact.note:
-        for phrase in keep_phrases:
-            if phrase and phrase.lower() in contact.note.lower():
-                return False, None  # Keep this contact regardless of other rules
-    
-    # Check email domains
-    exclude_domains = config.get('exclude_email_domains', [])
-    for email in contact.emails:
-        for domain in exclude_domains:
-            if domain and domain.lower() in email.lower():
-                return True, f"Email domain: {domain}"
-    
-    # Check specific emails
-    exclude_emails = config.get('exclude_emails', [])
-    for email in contact.emails:
-        for excluded in exclude_emails:
-            if excluded and email.lower() == excluded.lower():
-                return True, f"Email: {excluded}"
-    
-    # Check organizations
-    exclude_orgs = config.get('exclude_organizations', [])
-    if contact.organization:
-        org_str = str(contact.organization).lower()
-        for excluded_org in exclude_orgs:
-            if excluded_org and excluded_org.lower() in org_str:
-                return True, f"Organization: {excluded_org}"
-    
-    # Check phone prefixes
-    exclude_prefixes = config.get('exclude_phone_prefixes', [])
-    for phone in contact.phones:
-        # Normalize phone for comparison
-        normalized_phone = re.sub(r'[^\d+]', '', phone)
-        for prefix in exclude_prefixes:
-            if prefix:
-                normalized_prefix = re.sub(r'[^\d+]', '', prefix)
-                if normalized_phone.startswith(normalized_prefix):
-                    return True, f"Phone prefix: {prefix}"
-    
-    # Check name patterns
-    exclude_patterns = config.get('exclude_name_patterns', [])
-    name = contact.full_name.lower() if contact.full_name else ""
-    for pattern in exclude_patterns:
-        if pattern and pattern.lower() in name:
-            return True, f"Name pattern: {pattern}"
-    
+    if filters.keep_phrases and contact.note:
+        note = contact.note.lower()
+        if any(phrase in note for phrase in filters.keep_phrases):
+            return False, None  # Keep this contact regardless of other rules
+
+    automaton = filters.automaton
+
+    # Checks run cheapest first: most contacts are kept, so the common
+    # path should fail every rule as quickly as possible. Single-string
+    # checks come before the per-email and per-phone loops.
+
+    # Check name patterns (one string). The contact's cached normalized
+    # fields are used throughout so each field is lowercased at most once
+    # even across repeated filter runs.
+    name = contact.get_normalized_name()
+    if name:
+        if automaton is not None:
+            needle = _first_match(automaton, name, 'name')
+            if needle:
+                return True, f"Name pattern: {needle}"
+        else:
+            match = next((original for pattern, original in filters.name_patterns
+                          if pattern in name), None)
+            if match:
+                return True, f"Name pattern: {match}"
+
+    # Check specific emails (hash lookup per email)
+    if filters.emails:
+        for email in contact.get_normalized_emails():
+            original = filters.emails.get(email)
+            if original is not None:
+                return True, f"Email: {original}"
+
+    # Check organizations (one string)
+    org_str = contact.get_normalized_org()
+    if org_str:
+        if automaton is not None:
+            needle = _first_match(automaton, org_str, 'organization')
+            if needle:
+                return True, f"Organization: {needle}"
+        else:
+            match = next((original for excluded_org, original in filters.orgs
+                          if excluded_org in org_str), None)
+            if match:
+                return True, f"Organization: {match}"
+
+    # Check email domains: compare only the part after '@' — a hash
+    # lookup for the exact domain, with an endswith pass for subdomains
+    if filters.domains:
+        for email in contact.get_normalized_emails():
+            domain = email.rsplit('@', 1)[-1]
+            original = filters.domains.get(domain)
+            if original is None:
+                original = next((orig for d, orig in filters.domains.items()
+                                 if domain.endswith('.' + d)), None)
+            if original is not None:
+                return True, f"Email domain: {original}"
+
+    # Check phone prefixes last (normalization makes this the priciest;
+    # each phone is normalized once and walked through the prefix trie)
+    if filters.phone_trie:
+        for phone in contact.phones:
+            match = _match_phone_trie(filters.phone_trie,
+                                      strip_phone_formatting(phone))
+            if match:
+                return True, f"Phone prefix: {match}"
+
     return False, None
 
 
 def filter_contacts(contacts, config):
     """
     Filter contacts based on configuration rules.
-    
-    Returns:
-        (filtered_contacts, excluded_contacts, exclusion_reasons)
+
+    Yields:
+        (contact, reason) pairs in input order; reason is None for
+        contacts that pass every rule. Yielding lets the caller build
+        its kept/excluded lists and the report in one pass instead of
+        re-zipping parallel result lists.
     """
-    filtered = []
-    excluded = []
-    exclusion_reasons = []
-    
+    # All rule preparation happens once, outside the per-contact loop
+    filters = prepare_filters(config)
+
     for contact in contacts:
-        should_exclude, reason = should_exclude_contact(contact, config)
-        
-        if should_exclude:
-            excluded.append(contact)
-            exclusion_reasons.append(reason)
-        else:
-            filtered.append(contact)
-    
-    return filtered, excluded, exclusion_reasons
+        should_exclude, reason = should_exclude_contact(contact, filters)
+        yield contact, reason if should_exclude else None
 
 
 def main():
@@ -178,10 +347,28 @@ Examples:
     contacts = parse_vcard_file(args.input)
     print(f"✓ Found {len(contacts)} contacts")
     
-    # Apply filters
+    # Apply filters. One pass sorts contacts into kept/excluded and
+    # builds the report entries as exclusions are found.
     print(f"\nApplying filters...")
-    filtered_contacts, excluded_contacts, exclusion_reasons = filter_contacts(contacts, config)
-    
+    filtered_contacts = []
+    excluded_contacts = []
+    report_entries = []
+    for contact, reason in filter_contacts(contacts, config):
+        if reason is None:
+            filtered_contacts.append(contact)
+            continue
+        excluded_contacts.append(contact)
+        entry = [f"{len(excluded_contacts)}. {contact.full_name}\n",
+                 f"   Reason: {reason}\n"]
+        if contact.emails:
+            entry.append(f"   Emails: {', '.join(contact.emails)}\n")
+        if contact.phones:
+            entry.append(f"   Phones: {', '.join(contact.phones[:2])}\n")
+        if contact.organization:
+            entry.append(f"   Organization: {contact.organization}\n")
+        entry.append("\n")
+        report_entries.append(''.join(entry))
+
     print(f"✓ Kept {len(filtered_contacts)} contacts")
     print(f"✓ Excluded {len(excluded_contacts)} contacts")
     
@@ -200,30 +387,23 @@ Examples:
     export_contacts_to_vcard(excluded_contacts, excluded_path)
     print(f"✓ Excluded contacts saved to: {excluded_path}")
     
-    # Generate detailed exclusion report
+    # Generate detailed exclusion report: header plus the entries
+    # assembled during the filtering pass, written in one call
     report_path = os.path.join(args.output_dir, "exclusion_report.txt")
+    header = (
+        f"Contact Exclusion Report\n"
+        f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        + "=" * 80 + "\n\n"
+        f"Input file: {args.input}\n"
+        f"Filter config: {args.config}\n\n"
+        f"Total contacts: {len(contacts)}\n"
+        f"Kept: {len(filtered_contacts)}\n"
+        f"Excluded: {len(excluded_contacts)}\n\n"
+        "Excluded contacts:\n"
+        + "-" * 80 + "\n\n"
+    )
     with open(report_path, 'w', encoding='utf-8') as f:
-        f.write(f"Contact Exclusion Report\n")
-        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write("=" * 80 + "\n\n")
-        f.write(f"Input file: {args.input}\n")
-        f.write(f"Filter config: {args.config}\n\n")
-        f.write(f"Total contacts: {len(contacts)}\n")
-        f.write(f"Kept: {len(filtered_contacts)}\n")
-        f.write(f"Excluded: {len(excluded_contacts)}\n\n")
-        f.write("Excluded contacts:\n")
-        f.write("-" * 80 + "\n\n")
-        
-        for i, (contact, reason) in enumerate(zip(excluded_contacts, exclusion_reasons), 1):
-            f.write(f"{i}. {contact.full_name}\n")
-            f.write(f"   Reason: {reason}\n")
-            if contact.emails:
-                f.write(f"   Emails: {', '.join(contact.emails)}\n")
-            if contact.phones:
-                f.write(f"   Phones: {', '.join(contact.phones[:2])}\n")
-            if contact.organization:
-                f.write(f"   Organization: {contact.organization}\n")
-            f.write("\n")
+        f.write(header + ''.join(report_entries))
     
     print(f"✓ Exclusion report saved to: {report_path}")
     
@@ -16,6 +16,7 @@ Usage:
 import argparse
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 # Add lib directory to path
@@ -23,57 +24,66 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lib'))
 
 from vcard_parser import parse_vcard_file, export_contacts_to_vcard, Contact
 from detect_duplicates import (
-    find_duplicates, 
-    find_missing_contacts, 
+    find_duplicates,
+    find_cross_duplicates,
+    find_missing_contacts,
     merge_duplicate_contacts
 )
 
 
 def generate_duplicate_report(duplicates, output_path="duplicate_report.txt"):
     """Generate a human-readable duplicate report."""
+    # The whole report is assembled in memory and written in one call:
+    # a single encode and one pass through the buffered writer
+    parts = [
+        f"Duplicate Contact Report\n",
+        f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+        f"Total duplicate pairs found: {len(duplicates)}\n",
+        "=" * 80 + "\n\n",
+    ]
+    for i, (contact1, contact2, reason) in enumerate(duplicates, 1):
+        parts.append(f"Duplicate #{i}\n")
+        parts.append(f"Reason: {reason}\n")
+        parts.append(f"\nContact A:\n")
+        parts.append(f"  Name: {contact1.full_name}\n")
+        parts.append(f"  Phones: {', '.join(contact1.phones) if contact1.phones else 'None'}\n")
+        parts.append(f"  Emails: {', '.join(contact1.emails) if contact1.emails else 'None'}\n")
+        parts.append(f"  Organization: {contact1.organization or 'None'}\n")
+
+        parts.append(f"\nContact B:\n")
+        parts.append(f"  Name: {contact2.full_name}\n")
+        parts.append(f"  Phones: {', '.join(contact2.phones) if contact2.phones else 'None'}\n")
+        parts.append(f"  Emails: {', '.join(contact2.emails) if contact2.emails else 'None'}\n")
+        parts.append(f"  Organization: {contact2.organization or 'None'}\n")
+        parts.append("\n" + "-" * 80 + "\n\n")
+
     with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(f"Duplicate Contact Report\n")
-        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"Total duplicate pairs found: {len(duplicates)}\n")
-        f.write("=" * 80 + "\n\n")
-        
-        for i, (contact1, contact2, reason) in enumerate(duplicates, 1):
-            f.write(f"Duplicate #{i}\n")
-            f.write(f"Reason: {reason}\n")
-            f.write(f"\nContact A:\n")
-            f.write(f"  Name: {contact1.full_name}\n")
-            f.write(f"  Phones: {', '.join(contact1.phones) if contact1.phones else 'None'}\n")
-            f.write(f"  Emails: {', '.join(contact1.emails) if contact1.emails else 'None'}\n")
-            f.write(f"  Organization: {contact1.organization or 'None'}\n")
-            
-            f.write(f"\nContact B:\n")
-            f.write(f"  Name: {contact2.full_name}\n")
-            f.write(f"  Phones: {', '.join(contact2.phones) if contact2.phones else 'None'}\n")
-            f.write(f"  Emails: {', '.join(contact2.emails) if contact2.emails else 'None'}\n")
-            f.write(f"  Organization: {contact2.organization or 'None'}\n")
-            f.write("\n" + "-" * 80 + "\n\n")
-    
+        f.write(''.join(parts))
+
     print(f"✓ Duplicate report saved to: {output_path}")
 
 
 def generate_missing_report(missing_contacts, output_path="missing_contacts_report.txt"):
     """Generate a report of contacts missing from iPhone."""
+    parts = [
+        f"Missing Contacts Report\n",
+        f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+        f"Total contacts missing from iPhone: {len(missing_contacts)}\n",
+        "=" * 80 + "\n\n",
+    ]
+    for i, contact in enumerate(missing_contacts, 1):
+        parts.append(f"{i}. {contact.full_name}\n")
+        if contact.phones:
+            parts.append(f"   Phones: {', '.join(contact.phones)}\n")
+        if contact.emails:
+            parts.append(f"   Emails: {', '.join(contact.emails)}\n")
+        if contact.organization:
+            parts.append(f"   Organization: {contact.organization}\n")
+        parts.append("\n")
+
     with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(f"Missing Contacts Report\n")
-        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"Total contacts missing from iPhone: {len(missing_contacts)}\n")
-        f.write("=" * 80 + "\n\n")
-        
-        for i, contact in enumerate(missing_contacts, 1):
-            f.write(f"{i}. {contact.full_name}\n")
-            if contact.phones:
-                f.write(f"   Phones: {', '.join(contact.phones)}\n")
-            if contact.emails:
-                f.write(f"   Emails: {', '.join(contact.emails)}\n")
-            if contact.organization:
-                f.write(f"   Organization: {contact.organization}\n")
-            f.write("\n")
-    
+        f.write(''.join(parts))
+
     print(f"✓ Missing contacts report saved to: {output_path}")
 
 
@@ -124,17 +134,27 @@ Examples:
     if args.output_dir != '.' and not os.path.exists(args.output_dir):
         os.makedirs(args.output_dir)
     
-    # Parse Google contacts
-    print(f"\nParsing Google contacts from: {args.google}")
-    google_contacts = parse_vcard_file(args.google)
-    print(f"✓ Found {len(google_contacts)} Google contacts")
-    
-    # Parse iOS contacts if provided
+    # Parse contacts. Photos aren't needed here: reports only show text
+    # fields and exports reuse the raw card text, so skip the blobs.
+    # With both sources given, the two files parse on separate cores;
+    # each parse is independent, so they overlap completely.
     ios_contacts = []
     if args.ios:
-        print(f"\nParsing iOS contacts from: {args.ios}")
-        ios_contacts = parse_vcard_file(args.ios)
+        print(f"\nParsing Google contacts from: {args.google}")
+        print(f"Parsing iOS contacts from: {args.ios}")
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            google_future = executor.submit(parse_vcard_file, args.google,
+                                            load_photos=False)
+            ios_future = executor.submit(parse_vcard_file, args.ios,
+                                         load_photos=False)
+            google_contacts = google_future.result()
+            ios_contacts = ios_future.result()
+        print(f"✓ Found {len(google_contacts)} Google contacts")
         print(f"✓ Found {len(ios_contacts)} iOS contacts")
+    else:
+        print(f"\nParsing Google contacts from: {args.google}")
+        google_contacts = parse_vcard_file(args.google, load_photos=False)
+        print(f"✓ Found {len(google_contacts)} Google contacts")
     
     # Detect duplicates in Google contacts
     print(f"\nDetecting duplicates in Google contacts...")
@@ -165,17 +185,13 @@ Examples:
             print(f"     • AirDrop to iPhone")
             print(f"     • Upload to iCloud.com (Contacts → Settings gear → Import vCard)")
         
-        # Check for duplicates across both sources
+        # Check for duplicates across both sources. The cross-source
+        # search compares Google against iOS directly instead of running
+        # find_duplicates on a concatenated list and discarding the
+        # same-source pairs it mostly produces.
         print(f"\nDetecting duplicates across Google and iOS contacts...")
-        all_contacts = google_contacts + ios_contacts
-        cross_duplicates = find_duplicates(all_contacts, name_threshold=args.name_threshold)
-        
-        # Filter to only cross-platform duplicates
-        cross_only = []
-        for contact1, contact2, reason in cross_duplicates:
-            if (contact1 in google_contacts and contact2 in ios_contacts) or \
-               (contact2 in google_contacts and contact1 in ios_contacts):
-                cross_only.append((contact1, contact2, reason))
+        cross_only = find_cross_duplicates(google_contacts, ios_contacts,
+                                           name_threshold=args.name_threshold)
         
         if cross_only:
             print(f"✓ Found {len(cross_only)} duplicates across platforms")
@@ -185,16 +201,15 @@ Examples:
     # Generate cleaned contacts file (all unique Google contacts)
     print(f"\nGenerating cleaned contacts file...")
     
-    # Create a set to track which contacts are duplicates
+    # Create a set to track which contacts are duplicates. One identity-
+    # keyed position map replaces a full list.index scan per pair.
+    pos = {id(c): i for i, c in enumerate(google_contacts)}
     duplicate_indices = set()
     for contact1, contact2, _ in google_duplicates:
-        # Find indices
-        try:
-            idx1 = google_contacts.index(contact1)
-            idx2 = google_contacts.index(contact2)
+        idx1 = pos.get(id(contact1))
+        idx2 = pos.get(id(contact2))
+        if idx1 is not None and idx2 is not None:
             duplicate_indices.add(max(idx1, idx2))  # Keep first, mark second as duplicate
-        except ValueError:
-            pass
     
     # Keep only non-duplicate contacts
     unique_contacts = [c for i, c in enumerate(google_contacts) if i not in duplicate_indices]